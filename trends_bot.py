@@ -1,20 +1,22 @@
 import os
 import asyncio
-import schedule
 import time
-import json
-import requests
-import xml.etree.ElementTree as ET
+import aiohttp
+import orjson
+from lxml import etree
 from datetime import datetime
-from bs4 import BeautifulSoup
-from googleapiclient.discovery import build
+from typing import Optional
 from dotenv import load_dotenv
 
 # 환경 변수 로드
 load_dotenv('.env.local')
 
-# 디버그 모드 설정
-DEBUG_MODE = True
+# 디버그 모드 및 업데이트 주기(초) 설정
+DEBUG_MODE = os.getenv('DEBUG', '1') == '1'
+UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '3600'))
+
+if UPDATE_INTERVAL <= 0:
+    raise ValueError(f"UPDATE_INTERVAL은 0보다 커야 합니다 (현재 값: {UPDATE_INTERVAL}). .env.local 파일을 확인해주세요.")
 
 def debug_print(message):
     """디버그 메시지 출력"""
@@ -29,89 +31,186 @@ YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 if not all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, YOUTUBE_API_KEY]):
     raise ValueError("필요한 환경 변수가 설정되지 않았습니다. .env.local 파일을 확인해주세요.")
 
-def send_telegram_message(message):
+# YouTube Data API 인기 동영상 엔드포인트
+YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+# 구글 트렌드 RSS 항목 추출용 XPath (모듈 로드 시 한 번만 컴파일)
+TRENDS_NS = {'ht': 'https://trends.google.com/trending/rss'}
+XP_TITLE = etree.XPath('string(title)')
+XP_TRAFFIC = etree.XPath('string(ht:approx_traffic)', namespaces=TRENDS_NS)
+XP_NEWS_FIRST = etree.XPath('ht:news_item[1]', namespaces=TRENDS_NS)
+XP_NEWS_TITLE = etree.XPath('string(ht:news_item_title)', namespaces=TRENDS_NS)
+XP_NEWS_URL = etree.XPath('string(ht:news_item_url)', namespaces=TRENDS_NS)
+XP_NEWS_SOURCE = etree.XPath('string(ht:news_item_source)', namespaces=TRENDS_NS)
+
+# 국가별 표시 정보와 메시지 헤더 템플릿
+_FLAG = {'KR': '🇰🇷', 'US': '🇺🇸'}
+_NAME = {'KR': '한국', 'US': '미국'}
+_HEADER_TEMPLATE_GOOGLE = "{flag} {name} 구글 트렌드 (실시간 TOP 10)\n\n"
+_HEADER_TEMPLATE_YOUTUBE = "{flag} {name} 유튜브 인기 동영상 TOP 10\n\n"
+
+# 텔레그램 메시지 최대 길이와 섹션 구분자
+TELEGRAM_MAX_LENGTH = 4096
+MESSAGE_SEPARATOR = "\n\n──────\n\n"
+
+# 텔레그램 전송 재시도 설정 (일시적 오류 상태 코드에 대해서만 지수 백오프로 재시도)
+TELEGRAM_RETRY_COUNT = 3
+TELEGRAM_RETRY_BACKOFF = 0.5
+TELEGRAM_RETRY_STATUSES = {429, 500, 502, 503, 504}
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# HTTP 세션 (main()에서 생성하여 프로세스 전체에서 재사용)
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=25, connect=10)
+_session: Optional[aiohttp.ClientSession] = None
+
+# 진행 중인 트렌드 수집 작업 (동시 호출 시 하나의 작업을 공유)
+_in_flight: Optional[asyncio.Future] = None
+
+# 트렌드 캐시 (key: (소스, 국가), value: (만료 시각, 포맷된 트렌드))
+GOOGLE_CACHE_TTL = 120
+YOUTUBE_CACHE_TTL = 300
+_trend_cache: dict[tuple[str, str], tuple[float, str]] = {}
+
+def _telegram_length(text):
+    """텔레그램 기준(UTF-16 코드 유닛) 메시지 길이"""
+    return len(text.encode('utf-16-le')) // 2
+
+def split_message(parts):
+    """섹션 경계 기준으로 텔레그램 최대 길이에 맞게 메시지를 나누는 함수"""
+    messages = []
+    current = ""
+    for part in parts:
+        candidate = f"{current}{MESSAGE_SEPARATOR}{part}" if current else part
+        if current and _telegram_length(candidate) > TELEGRAM_MAX_LENGTH:
+            messages.append(current)
+            current = part
+        else:
+            current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+async def send_telegram_message(message):
     """텔레그램으로 메시지를 전송하는 함수"""
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        data = {
+        payload = orjson.dumps({
             "chat_id": TELEGRAM_CHAT_ID,
             "text": message,
             "parse_mode": "HTML"
-        }
-        response = requests.post(url, json=data)
-        
-        if response.status_code == 200:
-            debug_print("텔레그램 메시지 전송 성공")
-        else:
-            debug_print(f"텔레그램 메시지 전송 실패: {response.status_code}")
+        })
+        for attempt in range(TELEGRAM_RETRY_COUNT + 1):
+            delay = TELEGRAM_RETRY_BACKOFF * 2 ** attempt
+            try:
+                async with _session.post(url, data=payload, headers=JSON_HEADERS) as response:
+                    status = response.status
+                    if status == 429:
+                        # 요청 한도 초과 시 텔레그램이 알려준 시간만큼 대기
+                        body = await response.json(content_type=None)
+                        delay = body.get("parameters", {}).get("retry_after", delay)
+                
+                if status == 200:
+                    debug_print("텔레그램 메시지 전송 성공")
+                    return
+                
+                debug_print(f"텔레그램 메시지 전송 실패 (시도 {attempt + 1}/{TELEGRAM_RETRY_COUNT + 1}): {status}")
+                if status not in TELEGRAM_RETRY_STATUSES:
+                    return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # 연결 오류와 타임아웃도 같은 간격으로 재시도
+                debug_print(f"텔레그램 메시지 전송 중 에러 발생 (시도 {attempt + 1}/{TELEGRAM_RETRY_COUNT + 1}): {str(e)}")
+            
+            if attempt < TELEGRAM_RETRY_COUNT:
+                await asyncio.sleep(delay)
             
     except Exception as e:
         debug_print(f"텔레그램 메시지 전송 중 에러 발생: {str(e)}")
 
+def _format_google_item(idx, item):
+    """RSS 항목 하나를 메시지 문자열로 포맷팅 (관련 뉴스는 첫 번째만 사용)"""
+    line = f"{idx}위) 🔍 {XP_TITLE(item)} ({XP_TRAFFIC(item)})\n"
+    news = XP_NEWS_FIRST(item)
+    if not news:
+        return line
+    first_news = news[0]
+    return f"{line}📰 {XP_NEWS_TITLE(first_news)}\n🔗 {XP_NEWS_URL(first_news)}\n📱 {XP_NEWS_SOURCE(first_news)}"
+
 async def get_google_trends(country):
     """구글 트렌드 RSS 피드를 가져오는 함수"""
     debug_print(f"구글 트렌드 수집 시작 (국가: {country})...")
     
+    cache_key = ("google", country)
+    expiry, cached = _trend_cache.get(cache_key, (0, None))
+    if expiry > time.time():
+        debug_print(f"{country} 구글 트렌드 캐시 사용")
+        return cached
+    
     try:
         # RSS 피드 URL
         rss_url = f"https://trends.google.com/trending/rss?geo={country}"
-        response = requests.get(rss_url)
+        async with _session.get(rss_url) as response:
+            status = response.status
+            body = await response.read()
         
-        if response.status_code == 200:
+        if status == 200:
             # XML 파싱
-            root = ET.fromstring(response.content)
-            channel = root.find('channel')
-            items = channel.findall('item')
+            root = etree.fromstring(body)
             
-            trends_data = []
-            for idx, item in enumerate(items, 1):
-                title = item.find('title').text
-                traffic = item.find('{https://trends.google.com/trending/rss}approx_traffic').text
-                
-                # 관련 뉴스 수집
-                news_items = item.findall('{https://trends.google.com/trending/rss}news_item')
-                news_data = []
-                
-                if news_items:
-                    first_news = news_items[0]
-                    news_title = first_news.find('{https://trends.google.com/trending/rss}news_item_title').text
-                    news_url = first_news.find('{https://trends.google.com/trending/rss}news_item_url').text
-                    news_source = first_news.find('{https://trends.google.com/trending/rss}news_item_source').text
-                    news_data.append(f"📰 {news_title}\n🔗 {news_url}\n📱 {news_source}")
-                
-                trend_info = f"{idx}위) 🔍 {title} ({traffic})\n" + "\n".join(news_data)
-                trends_data.append(trend_info)
-            
-            country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
-            country_name = "한국" if country == "KR" else "미국"
-            formatted_trends = f"{country_emoji} {country_name} 구글 트렌드 (실시간 TOP 10)\n\n" + "\n\n".join(trends_data)
+            items = enumerate(root.iterfind('channel/item'), 1)
+            header = _HEADER_TEMPLATE_GOOGLE.format(flag=_FLAG[country], name=_NAME[country])
+            formatted_trends = header + "\n\n".join(_format_google_item(idx, item) for idx, item in items)
             
+            _trend_cache[cache_key] = (time.time() + GOOGLE_CACHE_TTL, formatted_trends)
             debug_print(f"{country} 트렌드 수집 완료")
             return formatted_trends
             
         else:
-            debug_print(f"RSS 피드 요청 실패: {response.status_code}")
+            debug_print(f"RSS 피드 요청 실패: {status}")
             return None
             
     except Exception as e:
         debug_print(f"구글 트렌드 수집 중 에러 발생 ({country}): {str(e)}")
         return None
 
+def _fmt_views(views):
+    """조회수 포맷팅 (정수 연산으로 소수점 첫째 자리까지 반올림)"""
+    if views >= 10_000_000:  # 1천만 이상
+        tenths = (views + 500_000) // 1_000_000
+        return f"{tenths // 10}.{tenths % 10}천만"
+    if views >= 10_000:  # 1만 이상
+        tenths = (views + 500) // 1_000
+        return f"{tenths // 10}.{tenths % 10}만"
+    return format(views, ',d')
+
 async def get_youtube_trends(region_code="KR"):
     """유튜브 트렌드를 가져오는 함수"""
     debug_print(f"유튜브 트렌드 수집 시작... (국가: {region_code})")
     
+    cache_key = ("youtube", region_code)
+    expiry, cached = _trend_cache.get(cache_key, (0, None))
+    if expiry > time.time():
+        debug_print(f"유튜브 트렌드 캐시 사용 (국가: {region_code})")
+        return cached
+    
     try:
-        youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+        # 지정된 국가의 인기 동영상 가져오기 (YouTube Data API REST 엔드포인트 직접 호출)
+        params = {
+            "part": "snippet,statistics",
+            "chart": "mostPopular",
+            "regionCode": region_code,
+            "maxResults": 10,
+            "fields": "items(id,snippet(title,channelTitle),statistics(viewCount))",
+            "key": YOUTUBE_API_KEY
+        }
+        async with _session.get(YOUTUBE_VIDEOS_URL, params=params) as resp:
+            status = resp.status
+            body = await resp.read()
         
-        # 지정된 국가의 인기 동영상 가져오기
-        request = youtube.videos().list(
-            part="snippet,statistics",
-            chart="mostPopular",
-            regionCode=region_code,
-            maxResults=10
-        )
-        response = request.execute()
+        if status != 200:
+            debug_print(f"유튜브 API 요청 실패 ({region_code}): {status}")
+            return None
+        
+        response = orjson.loads(body)
         
         trends_data = []
         for idx, item in enumerate(response['items'], 1):
@@ -121,19 +220,11 @@ async def get_youtube_trends(region_code="KR"):
             video_id = item['id']
             video_url = f"https://youtu.be/{video_id}"
             
-            # 조회수 포맷팅
-            if views >= 10000000:
-                views_str = f"{views/10000000:.1f}천만"
-            elif views >= 10000:
-                views_str = f"{views/10000:.1f}만"
-            else:
-                views_str = f"{views:,}"
-            
-            trends_data.append(f"{idx}위) 📺 {title}\n👤 {channel} | 👁 {views_str}회\n🔗 {video_url}")
+            trends_data.append(f"{idx}위) 📺 {title}\n👤 {channel} | 👁 {_fmt_views(views)}회\n🔗 {video_url}")
         
-        country_emoji = "🇰🇷" if region_code == "KR" else "🇺🇸"
-        country_name = "한국" if region_code == "KR" else "미국"
-        formatted_trends = f"{country_emoji} {country_name} 유튜브 인기 동영상 TOP 10\n\n" + "\n\n".join(trends_data)
+        header = _HEADER_TEMPLATE_YOUTUBE.format(flag=_FLAG[region_code], name=_NAME[region_code])
+        formatted_trends = header + "\n\n".join(trends_data)
+        _trend_cache[cache_key] = (time.time() + YOUTUBE_CACHE_TTL, formatted_trends)
         debug_print(f"유튜브 트렌드 수집 완료 (국가: {region_code})")
         return formatted_trends
             
@@ -142,42 +233,55 @@ async def get_youtube_trends(region_code="KR"):
         return None
 
 async def get_trends():
-    """트렌드 데이터를 수집하는 메인 함수"""
+    """트렌드 데이터를 수집하는 메인 함수 (동시에 호출되면 진행 중인 수집을 공유)"""
+    global _in_flight
+    if _in_flight is not None and not _in_flight.done():
+        debug_print("진행 중인 트렌드 수집 작업을 공유합니다.")
+        await asyncio.shield(_in_flight)
+        return
+    
+    task = asyncio.ensure_future(_collect_and_send_trends())
+    _in_flight = task
+    try:
+        await task
+    finally:
+        if _in_flight is task:
+            _in_flight = None
+
+async def _collect_and_send_trends():
+    """트렌드 데이터를 수집하여 전송하는 함수"""
     debug_print("\n=== 트렌드 데이터 수집 시작 ===")
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
     debug_print(f"수집 시작 시간: {current_time}")
     
     try:
-        # 1. 구글 트렌드 한국
-        kr_google_trends = await get_google_trends('KR')
-        if kr_google_trends is not None:
-            kr_google_message = f"📈 한국 구글 트렌드 업데이트 ({current_time})\n\n{kr_google_trends}"
-            send_telegram_message(kr_google_message)
-            debug_print("한국 구글 트렌드 전송 완료")
-            await asyncio.sleep(5)  # 5초 대기
-
-        # 2. 유튜브 트렌드 한국
-        kr_youtube_trends = await get_youtube_trends("KR")
-        if kr_youtube_trends is not None:
-            kr_youtube_message = f"📺 한국 유튜브 트렌드 업데이트 ({current_time})\n\n{kr_youtube_trends}"
-            send_telegram_message(kr_youtube_message)
-            debug_print("한국 유튜브 트렌드 전송 완료")
-            await asyncio.sleep(5)  # 5초 대기
-
-        # 3. 구글 트렌드 미국
-        us_google_trends = await get_google_trends('US')
-        if us_google_trends is not None:
-            us_google_message = f"📈 미국 구글 트렌드 업데이트 ({current_time})\n\n{us_google_trends}"
-            send_telegram_message(us_google_message)
-            debug_print("미국 구글 트렌드 전송 완료")
-            await asyncio.sleep(5)  # 5초 대기
-
-        # 4. 유튜브 트렌드 미국
-        us_youtube_trends = await get_youtube_trends("US")
-        if us_youtube_trends is not None:
-            us_youtube_message = f"📺 미국 유튜브 트렌드 업데이트 ({current_time})\n\n{us_youtube_trends}"
-            send_telegram_message(us_youtube_message)
-            debug_print("미국 유튜브 트렌드 전송 완료")
+        # 한국/미국 구글 트렌드와 유튜브 트렌드를 동시에 수집
+        results = await asyncio.gather(
+            get_google_trends('KR'),
+            get_youtube_trends('KR'),
+            get_google_trends('US'),
+            get_youtube_trends('US'),
+            return_exceptions=True
+        )
+        labels = [
+            ("📈", "한국 구글 트렌드"),
+            ("📺", "한국 유튜브 트렌드"),
+            ("📈", "미국 구글 트렌드"),
+            ("📺", "미국 유튜브 트렌드"),
+        ]
+        
+        parts = []
+        for (emoji, label), trends in zip(labels, results):
+            if isinstance(trends, Exception):
+                debug_print(f"{label} 수집 중 에러 발생: {str(trends)}")
+                continue
+            if trends is not None:
+                parts.append(f"{emoji} {label} 업데이트 ({current_time})\n\n{trends}")
+        
+        # 섹션을 하나의 메시지로 묶어 전송 (최대 길이 초과 시 섹션 경계에서 분할)
+        for message in split_message(parts):
+            await send_telegram_message(message)
+        debug_print(f"트렌드 {len(parts)}개 섹션 전송 완료")
         
         debug_print("=== 데이터 수집 완료 ===\n")
         
@@ -189,20 +293,26 @@ async def scheduled_job():
     """정해진 시간에 실행될 작업"""
     await get_trends()
 
-def run_scheduler():
+async def main():
     """스케줄러 실행"""
+    global _session
     print("=== 트렌드 봇 시작 ===")
-    print("매 시간마다 구글 트렌드와 유튜브 트렌드를 수집하여 텔레그램으로 전송합니다.")
-    
-    # 시작할 때 한 번 실행
-    asyncio.run(get_trends())
-    
-    # 매 시간마다 실행
-    schedule.every(1).hours.do(lambda: asyncio.run(scheduled_job()))
+    print(f"{UPDATE_INTERVAL // 60}분마다 구글 트렌드와 유튜브 트렌드를 수집하여 텔레그램으로 전송합니다.")
     
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=4, ttl_dns_cache=300, keepalive_timeout=75)
+    _session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+    try:
+        # 시작할 때 한 번 실행
+        await scheduled_job()
+        
+        # 자정 기준 UPDATE_INTERVAL 경계마다 실행 (기본값 3600초 = 매 정시)
+        while True:
+            now = datetime.now()
+            elapsed = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+            await asyncio.sleep(UPDATE_INTERVAL - elapsed % UPDATE_INTERVAL)
+            await scheduled_job()
+    finally:
+        await _session.close()
 
 if __name__ == "__main__":
-    run_scheduler()
+    asyncio.run(main())
@@ -1,26 +1,34 @@
 import os
+import sys
 import asyncio
-import schedule
-import time
-import json
+import orjson
+import msgspec
 import logging
+import queue
+import atexit
+import hashlib
+from logging.handlers import QueueHandler, QueueListener
 import aiohttp
-import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime
-import pytz
-from googleapiclient.discovery import build
+from aiolimiter import AsyncLimiter
+from lxml import etree
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, NamedTuple, Tuple
 from dataclasses import dataclass
+from collections import Counter
 from pathlib import Path
 
-# 로깅 설정
+# 로깅 설정 (파일 기록은 QueueListener 스레드에서 처리해 이벤트 루프를 막지 않음)
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.FileHandler('unified_trends.log'))
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('unified_trends.log'),
+        QueueHandler(_log_queue),
         logging.StreamHandler()
     ]
 )
@@ -58,10 +66,53 @@ if not all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, YOUTUBE_API_KEY, YOUTUBE_CHANN
     if not YOUTUBE_CHANNEL_ID: missing_vars.append('YOUTUBE_CHANNEL_ID')
     raise ValueError(f"다음 환경 변수가 설정되지 않았습니다: {', '.join(missing_vars)}. .env.local 파일을 확인해주세요.")
 
+# 구글 트렌드 RSS 항목 조회용 XPath (모듈 로드 시 한 번만 컴파일)
+_GT_NS = {'ht': 'https://trends.google.com/trending/rss'}
+_XP_TITLE = etree.XPath('string(title)', smart_strings=False)
+_XP_TRAFFIC = etree.XPath('string(ht:approx_traffic)', namespaces=_GT_NS, smart_strings=False)
+_XP_NEWS_FIRST = etree.XPath('ht:news_item[1]', namespaces=_GT_NS)
+_XP_NEWS_TITLE = etree.XPath('string(ht:news_item_title)', namespaces=_GT_NS, smart_strings=False)
+_XP_NEWS_URL = etree.XPath('string(ht:news_item_url)', namespaces=_GT_NS, smart_strings=False)
+_XP_NEWS_SOURCE = etree.XPath('string(ht:news_item_source)', namespaces=_GT_NS, smart_strings=False)
+
+# YouTube Data API 인기 동영상 조회 엔드포인트
+YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+# RSS 스트리밍 파싱 시 한 번에 읽을 바이트 수
+RSS_CHUNK_SIZE = 8192
+
+# 조회수 포맷 단위 (기준값, 나눗수, 단위) - 큰 기준값부터 비교
+_VIEW_UNITS = (
+    (10_000_000, 10_000_000, "천만"),  # 1천만 이상
+    (100_000, 10_000, "만"),  # 10만 이상
+)
+
+# 한국 시간대 / 요일 표기 (매 호출마다 조회하지 않도록 모듈 로드 시 한 번만 생성)
+KST = ZoneInfo("Asia/Seoul")
+WEEKDAYS = ('월', '화', '수', '목', '금', '토', '일')
+
+# 메시지 헤더용 국가 / 소스 표기 (이모지, 이름)
+_COUNTRY = {"KR": ("🇰🇷", "한국"), "US": ("🇺🇸", "미국")}
+_SOURCE = {"google": ("🔍", "구글 트렌드"), "youtube": ("📺", "유튜브 트렌드")}
+
+# HTTP 요청 시간 제한 (응답 없는 요청이 한 주기를 오래 붙잡지 않도록 기본값 300초 대신 사용)
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=25, connect=10)
+
+# 텔레그램 요청 헤더 (본문은 orjson으로 직접 직렬화)
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# 메시지 전송 순서 (소스, 국가)
+_SEND_ORDER = (("google", "KR"), ("google", "US"), ("youtube", "KR"), ("youtube", "US"))
+
 def get_korea_time():
     """한국 시간을 반환하는 함수"""
-    korea_tz = pytz.timezone('Asia/Seoul')
-    return datetime.now(korea_tz)
+    return datetime.now(KST)
+
+def get_korea_date_str() -> str:
+    """메시지 헤더용 한국 날짜 문자열 반환 (예: 2024-01-01 월요일)"""
+    current_time = get_korea_time()
+    weekday = WEEKDAYS[current_time.weekday()]
+    return current_time.strftime(f"%Y-%m-%d {weekday}요일")
 
 def is_update_time() -> bool:
     """현재 시간이 업데이트 가능한 시간인지 확인"""
@@ -86,6 +137,15 @@ def is_daily_update_time() -> bool:
     current_time = get_korea_time()
     return current_time.hour == 6 and current_time.minute < 5  # 6시 0분~5분 사이에만 실행
 
+def _drain_items(parser: etree.XMLPullParser):
+    """파서에 쌓인 완성된 item 요소를 하나씩 반환하고, 처리가 끝난 요소는 메모리에서 해제"""
+    for _, item in parser.read_events():
+        yield item
+        item.clear()
+        # 이미 처리한 앞쪽 형제 요소 제거
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+
 @dataclass
 class TrendItem:
     """트렌드 아이템 데이터 클래스"""
@@ -95,55 +155,112 @@ class TrendItem:
     description: str = ""  # 추가 설명 (트래픽, 조회수 등)
     url: str = ""  # 링크
 
+# 로컬 상태 파일 직렬화 (사람이 읽지 않는 파일이므로 JSON 대신 MessagePack 사용)
+_MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+_TRENDS_DECODER = msgspec.msgpack.Decoder(List[TrendItem])
+_SENT_ITEMS_DECODER = msgspec.msgpack.Decoder(List[Tuple[str, str, str]])
+_FIRST_RUN_DECODER = msgspec.msgpack.Decoder(Dict[str, bool])
+
+def _read_state(path: Path) -> Tuple[Optional[bytes], bool]:
+    """상태 파일 읽기 (MessagePack 파일이 없으면 이전 형식의 JSON 파일을 대신 읽음, (내용, JSON 여부) 반환)"""
+    for candidate, is_json in ((path, False), (path.with_suffix('.json'), True)):
+        if candidate.exists():
+            with open(candidate, 'rb') as f:
+                return f.read(), is_json
+    return None, False
+
+def _first_news(item: etree._Element) -> Optional[Tuple[str, str]]:
+    """첫 번째 관련 뉴스의 (설명, URL) 반환 (관련 뉴스가 없으면 None)"""
+    news = _XP_NEWS_FIRST(item)
+    if not news:
+        return None
+    first_news = news[0]
+    return (
+        f"📰 {_XP_NEWS_TITLE(first_news)} | 📱 {_XP_NEWS_SOURCE(first_news)}",
+        _XP_NEWS_URL(first_news),
+    )
+
+def _to_trend_item(item: etree._Element, rank: int) -> TrendItem:
+    """RSS item 요소를 TrendItem으로 변환"""
+    news_info, news_url = _first_news(item) or ("", "")
+    return TrendItem(
+        title=_XP_TITLE(item),
+        rank=rank,
+        source="google",
+        description=f"🔍 {_XP_TRAFFIC(item)} | {news_info}",
+        url=news_url
+    )
+
+class ChangeRecord(NamedTuple):
+    """트렌드 변경 기록 (kind: 'new', 'up', 'down')"""
+    kind: str
+    item: TrendItem
+    old_rank: Optional[int]
+    new_rank: int
+
 class UnifiedTrendsBot:
     def __init__(self):
-        self.youtube = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tg_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"  # 모든 채널 공통
         self.retry_count = 3
         self.retry_delay = 5
+        # 텔레그램 전송 속도 제한 (초당 1개, 같은 채팅방 기준 분당 20개)
+        self._rl_sec = AsyncLimiter(1, 1)
+        self._rl_min = AsyncLimiter(20, 60)
         self.data_dir = Path("unified_trends_data")
         self.data_dir.mkdir(exist_ok=True)
         self.is_first_run = self._load_first_run_state()
-        self.sent_items = set()  # 전송된 항목을 추적하는 세트
+        self.sent_items = set()  # 전송된 항목을 추적하는 세트 ((소스, 국가, 제목) 튜플)
+        self._sent_items_dirty = False  # 마지막 저장 이후 sent_items 변경 여부
+        self._last_hash = {}  # (소스, 국가)별 마지막으로 저장/로드한 데이터의 해시
         self._load_sent_items()  # 초기화시 항목 로드
 
     def _get_data_file_path(self, source: str, country: str) -> Path:
         """데이터 파일 경로 반환"""
-        return self.data_dir / f"{source}_{country}.json"
+        return self.data_dir / f"{source}_{country}.msgpack"
 
     def _get_first_run_file_path(self) -> Path:
         """첫 실행 상태 파일 경로 반환"""
-        return self.data_dir / "first_run.json"
+        return self.data_dir / "first_run.msgpack"
 
     def _get_sent_items_file_path(self) -> Path:
         """전송된 항목 파일 경로 반환"""
-        return self.data_dir / "sent_items.json"
+        return self.data_dir / "sent_items.msgpack"
 
     def _load_first_run_state(self) -> bool:
         """첫 실행 상태 로드"""
         file_path = self._get_first_run_file_path()
-        if not file_path.exists():
-            return True
-        
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)['is_first_run']
+            payload, is_json = _read_state(file_path)
+            if payload is None:
+                return True
+            state = orjson.loads(payload) if is_json else _FIRST_RUN_DECODER.decode(payload)
+            return state['is_first_run']
         except:
             return True
 
     def _save_first_run_state(self):
         """첫 실행 상태 저장"""
         file_path = self._get_first_run_file_path()
-        with open(file_path, 'w') as f:
-            json.dump({'is_first_run': False}, f)
+        with open(file_path, 'wb') as f:
+            f.write(_MSGPACK_ENCODER.encode({'is_first_run': False}))
         logger.info("첫 실행 상태를 false로 저장했습니다.")
 
     def _load_sent_items(self):
         """전송된 항목 로드"""
         file_path = self._get_sent_items_file_path()
-        if file_path.exists():
+        payload, is_json = _read_state(file_path)
+        if payload is not None:
             try:
-                with open(file_path, 'r') as f:
-                    self.sent_items = set(json.load(f))
+                if is_json:
+                    # 이전 형식(제목 문자열만 저장)은 소스/국가를 알 수 없으므로 무시
+                    entries = [entry for entry in orjson.loads(payload) if isinstance(entry, list)]
+                else:
+                    entries = _SENT_ITEMS_DECODER.decode(payload)
+                self.sent_items = {
+                    (sys.intern(source), sys.intern(country), title)
+                    for source, country, title in entries
+                }
                 logger.info(f"전송된 항목 {len(self.sent_items)}개를 로드했습니다.")
             except Exception as e:
                 logger.error(f"전송된 항목 로드 실패: {str(e)}")
@@ -152,12 +269,21 @@ class UnifiedTrendsBot:
             logger.info("전송된 항목 파일이 없습니다. 새로운 세트를 생성합니다.")
             self.sent_items = set()
 
+    def _mark_sent(self, source: str, country: str, items: List[TrendItem]):
+        """전송한 항목을 sent_items에 추가 (파일 저장은 주기 종료 시 한 번)"""
+        source, country = sys.intern(source), sys.intern(country)
+        self.sent_items.update((source, country, item.title) for item in items)
+        self._sent_items_dirty = True
+
     def _save_sent_items(self):
-        """전송된 항목 저장"""
+        """전송된 항목 저장 (변경사항이 있을 때만)"""
+        if not self._sent_items_dirty:
+            return
         file_path = self._get_sent_items_file_path()
         try:
-            with open(file_path, 'w') as f:
-                json.dump(list(self.sent_items), f)
+            with open(file_path, 'wb') as f:
+                f.write(_MSGPACK_ENCODER.encode(list(self.sent_items)))
+            self._sent_items_dirty = False
             logger.info(f"전송된 항목 {len(self.sent_items)}개를 저장했습니다.")
         except Exception as e:
             logger.error(f"전송된 항목 저장 실패: {str(e)}")
@@ -165,15 +291,21 @@ class UnifiedTrendsBot:
     def _reset_sent_items(self):
         """전송된 항목 초기화 (매일 6시에 호출)"""
         self.sent_items.clear()
-        self._save_sent_items()
+        self._sent_items_dirty = True
         logger.info("전송된 항목을 초기화했습니다.")
 
     def _save_trends_data(self, source: str, country: str, data: List[TrendItem]):
         """트렌드 데이터 저장"""
         file_path = self._get_data_file_path(source, country)
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump([item.__dict__ for item in data], f, ensure_ascii=False, indent=2)
+            payload = _MSGPACK_ENCODER.encode(data)
+            digest = hashlib.blake2b(payload, digest_size=8).digest()
+            if self._last_hash.get((source, country)) == digest:
+                logger.info(f"{source}_{country} 트렌드 데이터 변경 없음 (저장 생략)")
+                return
+            with open(file_path, 'wb') as f:
+                f.write(payload)
+            self._last_hash[(source, country)] = digest
             logger.info(f"{source}_{country} 트렌드 데이터 저장 완료")
         except Exception as e:
             logger.error(f"{source}_{country} 트렌드 데이터 저장 실패: {str(e)}")
@@ -182,168 +314,120 @@ class UnifiedTrendsBot:
         """트렌드 데이터 로드"""
         file_path = self._get_data_file_path(source, country)
         try:
-            if not file_path.exists():
+            payload, is_json = _read_state(file_path)
+            if payload is None:
                 logger.info(f"{source}_{country} 트렌드 데이터 파일이 없습니다.")
                 return []
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"{source}_{country} 트렌드 데이터 로드 완료")
-                return [TrendItem(**item) for item in data]
+            if is_json:
+                # 이전 JSON 파일은 해시를 남기지 않아 다음 저장 때 MessagePack으로 다시 기록
+                data = [TrendItem(**item) for item in orjson.loads(payload)]
+            else:
+                data = _TRENDS_DECODER.decode(payload)
+                self._last_hash[(source, country)] = hashlib.blake2b(payload, digest_size=8).digest()
+            logger.info(f"{source}_{country} 트렌드 데이터 로드 완료")
+            return data
         except Exception as e:
             logger.error(f"{source}_{country} 트렌드 데이터 로드 실패: {str(e)}")
             return []
 
-    def _detect_changes(self, old_data: List[TrendItem], new_data: List[TrendItem]) -> Dict[str, List[Any]]:
-        """트렌드 변경 감지"""
-        changes = {
-            'new': [],
-            'up': [],    # 순위 상승
-            'down': [],  # 순위 하락
-            'same': []   # 순위 동일
-        }
-
+    def _detect_changes(self, old_data: List[TrendItem], new_data: List[TrendItem]) -> List[ChangeRecord]:
+        """트렌드 변경 감지 (신규/상승/하락 항목을 새 순위 순서로 반환)"""
         # 이전 데이터를 딕셔너리로 변환 (key: title, value: 순위)
-        old_items = {item.title: item.rank for item in old_data}
+        old_ranks = {item.title: item.rank for item in old_data}
         
-        logger.info(f"이전 데이터: {len(old_items)}개")
+        logger.info(f"이전 데이터: {len(old_ranks)}개")
         
-        # 새로운 항목과 순위 변경 감지
+        # 새로운 항목과 순위 변경 감지 (new_data는 순위순이므로 결과도 순위순, 항목별 로그는 DEBUG 레벨)
+        changes = []
+        same_count = 0
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         for new_item in new_data:
-            if new_item.title in old_items:
-                old_rank = old_items[new_item.title]
-                if new_item.rank < old_rank:  # 순위 상승
-                    logger.info(f"순위 상승: {new_item.title} ({old_rank}위 → {new_item.rank}위)")
-                    changes['up'].append({
-                        'item': new_item,
-                        'old_rank': old_rank,
-                        'new_rank': new_item.rank
-                    })
-                elif new_item.rank > old_rank:  # 순위 하락
-                    logger.info(f"순위 하락: {new_item.title} ({old_rank}위 → {new_item.rank}위)")
-                    changes['down'].append({
-                        'item': new_item,
-                        'old_rank': old_rank,
-                        'new_rank': new_item.rank
-                    })
-                else:  # 순위 동일
-                    changes['same'].append(new_item)
-            else:
+            old_rank = old_ranks.get(new_item.title)
+            if old_rank is None:
                 # 완전히 새로운 항목
-                logger.info(f"신규 진입: {new_item.title} ({new_item.rank}위)")
-                changes['new'].append(new_item)
-
-        # 변경사항 로깅
-        logger.info(f"변경사항 요약:")
-        logger.info(f"- 신규 진입: {len(changes['new'])}개")
-        logger.info(f"- 순위 상승: {len(changes['up'])}개")
-        logger.info(f"- 순위 하락: {len(changes['down'])}개")
-        logger.info(f"- 순위 유지: {len(changes['same'])}개")
+                if debug_enabled:
+                    logger.debug(f"신규 진입: {new_item.title} ({new_item.rank}위)")
+                changes.append(ChangeRecord('new', new_item, None, new_item.rank))
+            elif new_item.rank < old_rank:  # 순위 상승
+                if debug_enabled:
+                    logger.debug(f"순위 상승: {new_item.title} ({old_rank}위 → {new_item.rank}위)")
+                changes.append(ChangeRecord('up', new_item, old_rank, new_item.rank))
+            elif new_item.rank > old_rank:  # 순위 하락
+                if debug_enabled:
+                    logger.debug(f"순위 하락: {new_item.title} ({old_rank}위 → {new_item.rank}위)")
+                changes.append(ChangeRecord('down', new_item, old_rank, new_item.rank))
+            else:  # 순위 동일
+                same_count += 1
+
+        # 변경사항 요약 로깅
+        counts = Counter(change.kind for change in changes)
+        logger.info(
+            f"변경사항 요약: 신규 진입 {counts['new']}개, 순위 상승 {counts['up']}개, "
+            f"순위 하락 {counts['down']}개, 순위 유지 {same_count}개"
+        )
 
         return changes
 
-    def _format_changes_message(self, changes: Dict[str, List[Any]], source: str, country: str) -> Optional[str]:
+    def _format_changes_message(self, changes: List[ChangeRecord], source: str, country: str, date_str: str) -> Optional[str]:
         """변경사항 메시지 포맷팅"""
         # 변경사항이 없으면 None 반환
-        if not (changes['new'] or changes['up'] or changes['down']):
+        if not changes:
             logger.info("변경사항이 없어 메시지를 전송하지 않습니다.")
             return None
 
-        country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
-        country_name = "한국" if country == "KR" else "미국"
-        source_emoji = "🔍" if source == "google" else "📺"
-        source_name = "구글 트렌드" if source == "google" else "유튜브 트렌드"
-        
-        current_time = get_korea_time()
-        weekdays = ['월', '화', '수', '목', '금', '토', '일']
-        weekday = weekdays[current_time.weekday()]
-        date_str = current_time.strftime(f"%Y-%m-%d {weekday}요일")
-        
-        message = f"{source_emoji} {country_emoji} {country_name} {source_name} 업데이트 ({date_str})\n"
-        message += "📊 순위 변경 및 신규 진입\n\n"
-        
-        # 모든 변경사항 합치기
-        all_changes = []
+        country_emoji, country_name = _COUNTRY[country]
+        source_emoji, source_name = _SOURCE[source]
         
-        # 신규 진입
-        for item in changes['new']:
-            all_changes.append({
-                'item': item,
-                'type': 'new',
-                'rank': item.rank
-            })
-        
-        # 순위 상승
-        for change in changes['up']:
-            all_changes.append({
-                'item': change['item'],
-                'type': 'up',
-                'old_rank': change['old_rank'],
-                'new_rank': change['new_rank']
-            })
-
-        # 순위 하락
-        for change in changes['down']:
-            all_changes.append({
-                'item': change['item'],
-                'type': 'down',
-                'old_rank': change['old_rank'],
-                'new_rank': change['new_rank']
-            })
-        
-        # 변경사항이 없으면 None 반환
-        if not all_changes:
-            logger.info("필터링 후 변경사항이 없어 메시지를 전송하지 않습니다.")
-            return None
-            
-        # 순위로 정렬
-        all_changes.sort(key=lambda x: x['item'].rank)
+        parts: List[str] = [
+            f"{source_emoji} {country_emoji} {country_name} {source_name} 업데이트 ({date_str})\n",
+            "📊 순위 변경 및 신규 진입\n\n",
+        ]
         
-        # 변경사항 포맷팅
-        for change in all_changes:
-            item = change['item']
+        # 변경사항 포맷팅 (이미 순위순으로 정렬되어 있음)
+        for change in changes:
+            item = change.item
             
-            if change['type'] == 'new':
-                message += f"{item.rank}위) {item.title} New\n"
-            elif change['type'] == 'up':
-                message += f"{item.rank}위) {item.title} {change['old_rank']} → {change['new_rank']}\n"
-            elif change['type'] == 'down':
-                message += f"{item.rank}위) {item.title} {change['old_rank']} → {change['new_rank']}\n"
+            if change.kind == 'new':
+                parts.append(f"{item.rank}위) {item.title} New\n")
+            else:
+                parts.append(f"{item.rank}위) {item.title} {change.old_rank} → {change.new_rank}\n")
             
-            message += f"{item.description}\n"
+            parts.append(f"{item.description}\n")
             if item.url:
-                message += f"🔗 {item.url}\n"
-            message += "\n"
+                parts.append(f"🔗 {item.url}\n")
+            parts.append("\n")
         
-        return message
+        return "".join(parts)
 
-    def _format_full_trends_message(self, source: str, country: str, data: List[TrendItem]) -> str:
+    def _format_full_trends_message(self, source: str, country: str, data: List[TrendItem], date_str: str) -> str:
         """전체 트렌드 데이터 메시지 포맷팅"""
-        country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
-        country_name = "한국" if country == "KR" else "미국"
-        source_emoji = "🔍" if source == "google" else "📺"
-        source_name = "구글 트렌드" if source == "google" else "유튜브 트렌드"
-        
-        current_time = get_korea_time()
-        weekdays = ['월', '화', '수', '목', '금', '토', '일']
-        weekday = weekdays[current_time.weekday()]
-        date_str = current_time.strftime(f"%Y-%m-%d {weekday}요일")
+        country_emoji, country_name = _COUNTRY[country]
+        source_emoji, source_name = _SOURCE[source]
         
-        message = f"{source_emoji} {country_emoji} {country_name} {source_name} ({date_str})\n\n"
+        parts: List[str] = [f"{source_emoji} {country_emoji} {country_name} {source_name} ({date_str})\n\n"]
         
         for item in data:
-            message += f"{item.rank}위) {item.title}\n"
-            message += f"{item.description}\n"
+            parts.append(f"{item.rank}위) {item.title}\n")
+            parts.append(f"{item.description}\n")
             if item.url:
-                message += f"🔗 {item.url}\n"
-            message += "\n"
+                parts.append(f"🔗 {item.url}\n")
+            parts.append("\n")
         
-        return message
+        return "".join(parts)
 
-    def init_youtube(self):
-        """YouTube API 클라이언트 초기화"""
-        if not self.youtube:
-            self.youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    def _get_session(self) -> aiohttp.ClientSession:
+        """공유 HTTP 세션 반환 (최초 호출 시 생성)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=64, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+        return self._session
+
+    async def shutdown(self):
+        """공유 HTTP 세션 종료"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def send_telegram_message(self, message: str, is_youtube: bool = False) -> bool:
         """텔레그램으로 메시지를 전송하는 함수"""
@@ -365,28 +449,31 @@ class UnifiedTrendsBot:
     async def _send_to_channel(self, chat_id: str, message: str) -> bool:
         """특정 채널로 메시지를 전송하는 내부 함수"""
         try:
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-            data = {
+            payload = orjson.dumps({
                 "chat_id": chat_id,
                 "text": message,
                 "parse_mode": "HTML"
-            }
+            })
             
+            session = self._get_session()
             for attempt in range(self.retry_count):
+                delay = self.retry_delay * 2 ** attempt
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(url, json=data) as response:
+                    async with self._rl_min, self._rl_sec:
+                        async with session.post(self._tg_url, data=payload, headers=_JSON_HEADERS) as response:
                             if response.status == 200:
                                 logger.info(f"텔레그램 메시지 전송 성공 (채널: {chat_id})")
                                 return True
-                            else:
-                                logger.error(f"텔레그램 메시지 전송 실패 (채널: {chat_id}, 시도 {attempt + 1}/{self.retry_count}): {response.status}")
-                                if attempt < self.retry_count - 1:
-                                    await asyncio.sleep(self.retry_delay)
+                            logger.error(f"텔레그램 메시지 전송 실패 (채널: {chat_id}, 시도 {attempt + 1}/{self.retry_count}): {response.status}")
+                            if response.status == 429:
+                                # 요청 한도 초과 시 텔레그램이 알려준 시간만큼 대기
+                                body = await response.json(content_type=None)
+                                delay = body.get("parameters", {}).get("retry_after", delay)
                 except Exception as e:
                     logger.error(f"텔레그램 메시지 전송 중 에러 발생 (채널: {chat_id}, 시도 {attempt + 1}/{self.retry_count}): {str(e)}")
-                    if attempt < self.retry_count - 1:
-                        await asyncio.sleep(self.retry_delay)
+                
+                if attempt < self.retry_count - 1:
+                    await asyncio.sleep(delay)
             
             return False
             
@@ -401,45 +488,26 @@ class UnifiedTrendsBot:
         try:
             # RSS 피드 URL
             rss_url = f"https://trends.google.com/trending/rss?geo={country}"
-            response = requests.get(rss_url)
+            trends_data = []
+            async with self._get_session().get(rss_url) as response:
+                status = response.status
+                if status == 200:
+                    # 응답을 받는 대로 스트리밍 파싱 (item 단위로 처리 후 메모리 해제)
+                    parser = etree.XMLPullParser(events=("end",), tag="item")
+                    async for chunk in response.content.iter_chunked(RSS_CHUNK_SIZE):
+                        parser.feed(chunk)
+                        trends_data.extend([
+                            _to_trend_item(item, rank)
+                            for rank, item in enumerate(_drain_items(parser), len(trends_data) + 1)
+                        ])
+                    parser.close()
             
-            if response.status_code == 200:
-                # XML 파싱
-                root = ET.fromstring(response.content)
-                channel = root.find('channel')
-                items = channel.findall('item')
-                
-                trends_data = []
-                for idx, item in enumerate(items, 1):
-                    title = item.find('title').text
-                    traffic = item.find('{https://trends.google.com/trending/rss}approx_traffic').text
-                    
-                    # 관련 뉴스 수집
-                    news_items = item.findall('{https://trends.google.com/trending/rss}news_item')
-                    news_info = ""
-                    news_url = ""
-                    
-                    if news_items:
-                        first_news = news_items[0]
-                        news_title = first_news.find('{https://trends.google.com/trending/rss}news_item_title').text
-                        news_url = first_news.find('{https://trends.google.com/trending/rss}news_item_url').text
-                        news_source = first_news.find('{https://trends.google.com/trending/rss}news_item_source').text
-                        news_info = f"📰 {news_title} | 📱 {news_source}"
-                    
-                    trend_item = TrendItem(
-                        title=title,
-                        rank=idx,
-                        source="google",
-                        description=f"🔍 {traffic} | {news_info}",
-                        url=news_url
-                    )
-                    trends_data.append(trend_item)
-                
+            if status == 200:
                 logger.info(f"{country} 구글 트렌드 수집 완료")
                 return trends_data
                 
             else:
-                logger.error(f"RSS 피드 요청 실패: {response.status_code}")
+                logger.error(f"RSS 피드 요청 실패: {status}")
                 return []
                 
         except Exception as e:
@@ -451,17 +519,21 @@ class UnifiedTrendsBot:
         logger.info(f"유튜브 트렌드 수집 시작... (국가: {region_code})")
         
         try:
-            self.init_youtube()
+            # YouTube Data API REST 엔드포인트를 공유 세션으로 직접 호출 (이벤트 루프를 막지 않음)
+            params = {
+                "part": "snippet,statistics",
+                "chart": "mostPopular",
+                "regionCode": region_code,
+                "maxResults": 10,
+                "key": YOUTUBE_API_KEY
+            }
+            session = self._get_session()
             
             for attempt in range(self.retry_count):
                 try:
-                    request = self.youtube.videos().list(
-                        part="snippet,statistics",
-                        chart="mostPopular",
-                        regionCode=region_code,
-                        maxResults=10
-                    )
-                    response = request.execute()
+                    async with session.get(YOUTUBE_VIDEOS_URL, params=params) as r:
+                        r.raise_for_status()
+                        response = await r.json()
                     
                     trends_data = []
                     for idx, item in enumerate(response['items'], 1):
@@ -500,14 +572,12 @@ class UnifiedTrendsBot:
     @staticmethod
     def format_views(views: int) -> str:
         """조회수 포맷팅"""
-        if views >= 10000000:  # 1천만 이상
-            return f"{views/10000000:.1f}천만"
-        elif views >= 100000:  # 10만 이상
-            return f"{views/10000:.1f}만"
-        else:
-            return f"{views:,}"  # 천 단위 구분자
+        for threshold, divisor, suffix in _VIEW_UNITS:
+            if views >= threshold:
+                return f"{views / divisor:.1f}{suffix}"
+        return f"{views:,}"  # 천 단위 구분자
 
-    async def process_trends_data(self, source: str, country: str, data: List[TrendItem]):
+    async def process_trends_data(self, source: str, country: str, data: List[TrendItem], date_str: str):
         """트렌드 데이터 처리 및 전송"""
         try:
             # 1. 이전 데이터 로드
@@ -521,37 +591,33 @@ class UnifiedTrendsBot:
                 else:
                     logger.info("이전 데이터가 없습니다. 전체 데이터를 전송합니다.")
                 
-                message = self._format_full_trends_message(source, country, data)
+                message = self._format_full_trends_message(source, country, data, date_str)
                 success = await self.send_telegram_message(message, source == "youtube")
                 
                 if success:
                     logger.info(f"{source}_{country} 트렌드 전체 데이터 전송 완료")
-                    # 전송한 항목을 sent_items에 추가
-                    for item in data:
-                        self.sent_items.add(item.title)
-                    self._save_sent_items()
+                    self._mark_sent(source, country, data)
                     self._save_trends_data(source, country, data)
                 
             else:
                 # 3. 변경사항 감지 및 전송
                 changes = self._detect_changes(old_data, data)
                 
-                # 이미 전송된 항목 필터링
-                filtered_new = [item for item in changes['new'] if item.title not in self.sent_items]
-                changes['new'] = filtered_new
+                # 이미 전송된 신규 항목 제외
+                new_count = sum(1 for change in changes if change.kind == 'new')
+                changes = [change for change in changes
+                           if change.kind != 'new' or (source, country, change.item.title) not in self.sent_items]
+                filtered_new = [change.item for change in changes if change.kind == 'new']
                 
-                logger.info(f"필터링 후 신규 항목: {len(filtered_new)}개 (원래: {len(changes['new'])}개)")
+                logger.info(f"필터링 후 신규 항목: {len(filtered_new)}개 (원래: {new_count}개)")
                 
-                message = self._format_changes_message(changes, source, country)
+                message = self._format_changes_message(changes, source, country, date_str)
                 
                 if message:
                     success = await self.send_telegram_message(message, source == "youtube")
                     if success:
                         logger.info(f"{source}_{country} 트렌드 변경사항 전송 완료")
-                        # 전송한 항목을 sent_items에 추가
-                        for item in filtered_new:
-                            self.sent_items.add(item.title)
-                        self._save_sent_items()
+                        self._mark_sent(source, country, filtered_new)
                         self._save_trends_data(source, country, data)
                 else:
                     logger.info(f"{source}_{country} 트렌드 변경사항 없음")
@@ -571,32 +637,27 @@ class UnifiedTrendsBot:
         }
         
         try:
-            # 1. 구글 트렌드 한국
-            kr_google_trends = await self.get_google_trends("KR")
-            if kr_google_trends:
-                collected_data["google"]["KR"] = kr_google_trends
-                logger.info("한국 구글 트렌드 데이터 수집 완료")
-                await asyncio.sleep(5)
-
-            # 2. 유튜브 트렌드 한국
-            kr_youtube_trends = await self.get_youtube_trends("KR")
-            if kr_youtube_trends:
-                collected_data["youtube"]["KR"] = kr_youtube_trends
-                logger.info("한국 유튜브 트렌드 데이터 수집 완료")
-                await asyncio.sleep(5)
-
-            # 3. 구글 트렌드 미국
-            us_google_trends = await self.get_google_trends("US")
-            if us_google_trends:
-                collected_data["google"]["US"] = us_google_trends
-                logger.info("미국 구글 트렌드 데이터 수집 완료")
-                await asyncio.sleep(5)
-
-            # 4. 유튜브 트렌드 미국
-            us_youtube_trends = await self.get_youtube_trends("US")
-            if us_youtube_trends:
-                collected_data["youtube"]["US"] = us_youtube_trends
-                logger.info("미국 유튜브 트렌드 데이터 수집 완료")
+            # 구글/유튜브 트렌드를 한국/미국 동시에 수집
+            targets = [
+                ("google", "KR", "한국 구글 트렌드"),
+                ("youtube", "KR", "한국 유튜브 트렌드"),
+                ("google", "US", "미국 구글 트렌드"),
+                ("youtube", "US", "미국 유튜브 트렌드"),
+            ]
+            results = await asyncio.gather(
+                self.get_google_trends("KR"),
+                self.get_youtube_trends("KR"),
+                self.get_google_trends("US"),
+                self.get_youtube_trends("US"),
+                return_exceptions=True
+            )
+            
+            for (source, country, label), trends in zip(targets, results):
+                if isinstance(trends, Exception):
+                    logger.error(f"{label} 데이터 수집 중 에러 발생: {str(trends)}")
+                elif trends:
+                    collected_data[source][country] = trends
+                    logger.info(f"{label} 데이터 수집 완료")
             
             logger.info("=== 데이터 수집 완료 ===\n")
             return collected_data
@@ -606,6 +667,16 @@ class UnifiedTrendsBot:
             logger.error(f"치명적 에러 발생: {error_message}")
             return None
 
+    async def _send_full_trends(self, source: str, country: str, data: List[TrendItem], date_str: str):
+        """일일 전체 트렌드 데이터 전송"""
+        message = self._format_full_trends_message(source, country, data, date_str)
+        await self.send_telegram_message(message, source == "youtube")
+        logger.info(f"{source}_{country} 트렌드 전체 데이터 전송 완료")
+        
+        self._mark_sent(source, country, data)
+        
+        self._save_trends_data(source, country, data)
+
     async def send_trends_updates(self, collected_data):
         """트렌드 데이터를 전송하는 함수"""
         try:
@@ -614,33 +685,24 @@ class UnifiedTrendsBot:
                 logger.info("현재는 업데이트 시간이 아닙니다.")
                 return
 
+            # 이번 주기의 메시지 헤더 날짜는 한 번만 계산
+            date_str = get_korea_date_str()
+
             # 2. 매일 6시에는 전체 데이터 전송
             if is_daily_update_time():
                 logger.info("일일 전체 업데이트 시간입니다.")
                 # 6시에는 전송 항목 초기화
                 self._reset_sent_items()
                 
-                for source in ["google", "youtube"]:
-                    for country in ["KR", "US"]:
-                        if collected_data[source][country]:
-                            message = self._format_full_trends_message(source, country, collected_data[source][country])
-                            await self.send_telegram_message(message, source == "youtube")
-                            logger.info(f"{source}_{country} 트렌드 전체 데이터 전송 완료")
-                            
-                            # 전송한 항목을 sent_items에 추가
-                            for item in collected_data[source][country]:
-                                self.sent_items.add(item.title)
-                            self._save_sent_items()
-                            
-                            self._save_trends_data(source, country, collected_data[source][country])
+                for source, country in _SEND_ORDER:
+                    if collected_data[source][country]:
+                        await self._send_full_trends(source, country, collected_data[source][country], date_str)
                 return
 
-            # 3. 각 소스와 국가별로 변경사항 처리
-            for source in ["google", "youtube"]:
-                for country in ["KR", "US"]:
-                    if collected_data[source][country]:
-                        await self.process_trends_data(source, country, collected_data[source][country])
-                        await asyncio.sleep(5)  # 5초 대기
+            # 3. 각 소스와 국가별 변경사항을 정해진 순서대로 처리 (전송 간격은 속도 제한으로 조절)
+            for source, country in _SEND_ORDER:
+                if collected_data[source][country]:
+                    await self.process_trends_data(source, country, collected_data[source][country], date_str)
         
             # 첫 실행인 경우 상태 업데이트
             if self.is_first_run:
@@ -650,11 +712,14 @@ class UnifiedTrendsBot:
         except Exception as e:
             error_message = f"에러 발생: {str(e)}"
             logger.error(f"치명적 에러 발생: {error_message}")
+        finally:
+            # 이번 주기에 전송한 항목을 한 번에 저장
+            self._save_sent_items()
 
 def get_next_scheduled_time():
     """다음 예정된 실행 시간을 계산"""
     current_time = get_korea_time()
-    scheduled_hours = [6, 10, 14, 18, 22, 2]  # 4시간 간격의 실행 시간
+    scheduled_hours = [2, 6, 10, 14, 18, 22]  # 4시간 간격의 실행 시간
     
     # 현재 시간보다 큰 다음 실행 시간 찾기
     for hour in scheduled_hours:
@@ -662,10 +727,17 @@ def get_next_scheduled_time():
             next_time = current_time.replace(hour=hour, minute=0, second=0, microsecond=0)
             return next_time
     
-    # 다음 날 6시로 설정
-    next_time = current_time.replace(hour=6, minute=0, second=0, microsecond=0)
-    next_time = next_time.replace(day=next_time.day + 1)
-    return next_time
+    # 다음 날 첫 실행 시간으로 설정 (월말에도 안전하도록 timedelta 사용)
+    next_time = current_time.replace(hour=scheduled_hours[0], minute=0, second=0, microsecond=0)
+    return next_time + timedelta(days=1)
+
+async def _sleep_until(target: datetime):
+    """지정한 시각까지 대기 (깨어난 뒤 실제 시각을 다시 확인해 일찍 깨면 남은 시간만큼 더 대기)"""
+    while True:
+        remaining = (target - get_korea_time()).total_seconds()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(remaining)
 
 async def scheduled_job(bot: UnifiedTrendsBot):
     """정해진 시간에 실행될 작업"""
@@ -676,11 +748,11 @@ async def scheduled_job(bot: UnifiedTrendsBot):
     if is_update_time() and collected_data:
         await bot.send_trends_updates(collected_data)
 
-def run_scheduler():
-    """스케줄러 실행"""
+async def main():
+    """스케줄러 실행 (하나의 이벤트 루프와 HTTP 세션을 계속 유지)"""
     logger.info("=== 통합 트렌드 봇 시작 ===")
     logger.info("4시간 간격으로 구글 트렌드와 유튜브 트렌드를 수집하여 텔레그램으로 전송합니다.")
-    logger.info("실행 시간: 6시, 10시, 14시, 18시, 22시, 2시 (한국 시간)")
+    logger.info("실행 시간: 2시, 6시, 10시, 14시, 18시, 22시 (한국 시간)")
     logger.info("매일 6시에는 전체 데이터를 전송합니다.")
     
     # 디버그 모드 로그
@@ -690,26 +762,20 @@ def run_scheduler():
     # 봇 인스턴스 생성
     bot = UnifiedTrendsBot()
     
-    # 다음 예정된 시간 계산
-    next_time = get_next_scheduled_time()
-    logger.info(f"다음 실행 예정 시간: {next_time.strftime('%Y-%m-%d %H:%M')}")
-    
-    # 시작할 때 한 번 실행 (테스트용)
-    logger.info("테스트 실행을 시작합니다...")
-    asyncio.run(scheduled_job(bot))
-    logger.info("테스트 실행이 완료되었습니다.")
-    
-    # 4시간 간격으로 실행
-    schedule.every().day.at("06:00").do(lambda: asyncio.run(scheduled_job(bot)))
-    schedule.every().day.at("10:00").do(lambda: asyncio.run(scheduled_job(bot)))
-    schedule.every().day.at("14:00").do(lambda: asyncio.run(scheduled_job(bot)))
-    schedule.every().day.at("18:00").do(lambda: asyncio.run(scheduled_job(bot)))
-    schedule.every().day.at("22:00").do(lambda: asyncio.run(scheduled_job(bot)))
-    schedule.every().day.at("02:00").do(lambda: asyncio.run(scheduled_job(bot)))
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(10)  # 10초마다 체크
+    try:
+        # 시작할 때 한 번 실행 (테스트용)
+        logger.info("테스트 실행을 시작합니다...")
+        await scheduled_job(bot)
+        logger.info("테스트 실행이 완료되었습니다.")
+        
+        # 4시간 간격으로 실행
+        while True:
+            next_time = get_next_scheduled_time()
+            logger.info(f"다음 실행 예정 시간: {next_time.strftime('%Y-%m-%d %H:%M')}")
+            await _sleep_until(next_time)
+            await scheduled_job(bot)
+    finally:
+        await bot.shutdown()
 
 if __name__ == "__main__":
-    run_scheduler() 
\ No newline at end of file
+    asyncio.run(main())
@@ -1,15 +1,14 @@
 import os
 import asyncio
-import schedule
-import time
-import json
+import orjson
+import hashlib
 import logging
 import aiohttp
-from datetime import datetime
-import pytz
-from googleapiclient.discovery import build
+from aiolimiter import AsyncLimiter
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -43,10 +42,50 @@ YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 if not all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, YOUTUBE_API_KEY]):
     raise ValueError("필요한 환경 변수가 설정되지 않았습니다. .env.local 파일을 확인해주세요.")
 
+# YouTube Data API 인기 동영상 엔드포인트
+YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+# 순위 이모지 / 요일 표기 (메시지 포맷팅 시 매번 새로 만들지 않도록 모듈 상수로 정의)
+RANK_EMOJIS = {
+    1: "1️⃣", 2: "2️⃣", 3: "3️⃣", 4: "4️⃣", 5: "5️⃣",
+    6: "6️⃣", 7: "7️⃣", 8: "8️⃣", 9: "9️⃣", 10: "🔟"
+}
+WEEKDAYS = ('월', '화', '수', '목', '금', '토', '일')
+
+# 실행 시각 (한국 시간, 약 4시간 간격 / 1시 일일 요약, 6시 전체 업데이트 포함)
+SCHEDULED_HOURS = (1, 6, 10, 14, 18, 22)
+
+# HTTP 요청 시간 제한 (aiohttp 기본값 300초 대신 짧게 설정)
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=25, connect=10)
+
+# 텔레그램 요청 헤더 (본문은 orjson으로 직접 직렬화)
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# 여러 메시지를 하나로 합쳐 보낼 때의 길이 상한 (텔레그램 최대 4096자, 여유분 확보)
+TELEGRAM_BATCH_LIMIT = 4000
+MESSAGE_SEPARATOR = "\n\n"
+
+# 전송 대기열 최대 크기 (가득 차면 가장 오래된 메시지부터 버림)
+OUTBOX_MAX_SIZE = 200
+
+# 종료 시 남은 메시지 전송을 기다리는 최대 시간 (초)
+OUTBOX_DRAIN_TIMEOUT = 30
+
+def _telegram_length(text: str) -> int:
+    """텔레그램 기준(UTF-16 코드 유닛) 메시지 길이"""
+    return len(text.encode('utf-16-le')) // 2
+
+# 한국 시간대 (매 호출마다 조회하지 않도록 모듈 로드 시 한 번만 생성)
+KST = ZoneInfo("Asia/Seoul")
+
 def get_korea_time():
     """한국 시간을 반환하는 함수"""
-    korea_tz = pytz.timezone('Asia/Seoul')
-    return datetime.now(korea_tz)
+    return datetime.now(KST)
+
+def format_korea_date(current_time: datetime) -> str:
+    """메시지 헤더용 날짜 문자열 반환 (예: 2024-01-01 월요일)"""
+    weekday = WEEKDAYS[current_time.weekday()]
+    return current_time.strftime(f"%Y-%m-%d {weekday}요일")
 
 def is_update_time() -> bool:
     """현재 시간이 업데이트 가능한 시간인지 확인"""
@@ -79,7 +118,29 @@ def is_daily_summary_time() -> bool:
     current_time = get_korea_time()
     return current_time.hour == 1
 
-@dataclass
+def _atomic_write(path: Path, payload: bytes):
+    """임시 파일에 기록한 뒤 os.replace로 교체 (쓰기 도중 중단되어도 기존 파일 유지)"""
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _append_bytes(path: Path, payload: bytes):
+    """파일 끝에 바이트 추가 기록"""
+    with open(path, 'ab') as f:
+        f.write(payload)
+
+def _atomic_write_json(path: Path, obj: Any, option: int = 0):
+    """객체를 JSON으로 직렬화해 원자적으로 저장"""
+    _atomic_write(path, orjson.dumps(obj, option=option))
+
+def _payload_hash(payload: bytes) -> bytes:
+    """저장 데이터 비교용 해시"""
+    return hashlib.blake2b(payload, digest_size=8).digest()
+
+@dataclass(slots=True, frozen=True)
 class TrendItem:
     """트렌드 아이템 데이터 클래스"""
     title: str
@@ -87,18 +148,33 @@ class TrendItem:
     channel: str = ""
     views: str = ""
     url: str = ""
+    video_id: str = ""  # 유튜브 동영상 ID (변경 감지 키)
 
 class YouTubeTrendsBot:
     def __init__(self):
-        self.youtube = None
+        self._session: Optional[aiohttp.ClientSession] = None
         self.retry_count = 3
         self.retry_delay = 5
+        # 텔레그램 전송 속도 제한 (초당 30개, 같은 채팅방 기준 분당 20개)
+        self._rl_sec = AsyncLimiter(30, 1)
+        self._rl_min = AsyncLimiter(20, 60)
+        self._tg_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        self._tg_base = {"chat_id": TELEGRAM_CHAT_ID, "parse_mode": "HTML"}  # 메시지마다 공통인 전송 필드
+        # 전송 대기열 (수집/비교와 텔레그램 전송을 분리, startup()에서 생성)
+        self._outbox: Optional[asyncio.Queue] = None
+        self._sender_task: Optional[asyncio.Task] = None
         self.data_dir = Path("youtube_trends_data")
         self.data_dir.mkdir(exist_ok=True)
         self.is_first_run = self._load_first_run_state()
         self.sent_urls = set()  # 전송된 URL을 추적하는 세트
+        self._pending_urls: List[str] = []  # 아직 파일에 기록하지 않은 신규 URL
         self._load_sent_urls()  # 초기화시 URL 로드
         self.last_sent_time = {}  # 마지막 전송 시간을 추적하는 딕셔너리
+        self._data_hash: Dict[str, bytes] = {}  # 국가별 마지막으로 저장/로드한 데이터의 해시
+        # 국가별 최근 저장/로드한 트렌드 데이터와 video_id 인덱스
+        self._trends_cache: Dict[str, Tuple[List[TrendItem], Dict[str, TrendItem]]] = {}
+        for country in ("KR", "US"):
+            self._load_trends_data(country)  # 시작 시 캐시 미리 채우기
 
     def _get_data_file_path(self, country: str) -> Path:
         """데이터 파일 경로 반환"""
@@ -109,8 +185,8 @@ class YouTubeTrendsBot:
         return self.data_dir / "first_run.json"
 
     def _get_sent_urls_file_path(self) -> Path:
-        """전송된 URL 파일 경로 반환"""
-        return self.data_dir / "sent_urls.json"
+        """전송된 URL 파일 경로 반환 (한 줄에 URL 하나씩 추가 기록하는 JSONL)"""
+        return self.data_dir / "sent_urls.jsonl"
 
     def _get_last_sent_time_file_path(self) -> Path:
         """마지막 전송 시간 파일 경로 반환"""
@@ -123,51 +199,77 @@ class YouTubeTrendsBot:
             return True
         
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)['is_first_run']
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())['is_first_run']
         except:
             return True
 
     def _save_first_run_state(self):
         """첫 실행 상태 저장"""
         file_path = self._get_first_run_file_path()
-        with open(file_path, 'w') as f:
-            json.dump({'is_first_run': False}, f)
+        _atomic_write_json(file_path, {'is_first_run': False})
         logger.info("첫 실행 상태를 false로 저장했습니다.")
 
-    def _save_trends_data(self, country: str, data: List[TrendItem]):
-        """트렌드 데이터 저장"""
+    async def _save_trends_data(self, country: str, data: List[TrendItem]):
+        """트렌드 데이터 저장 (파일 쓰기는 별도 스레드에서 수행해 이벤트 루프를 막지 않음)"""
         file_path = self._get_data_file_path(country)
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump([item.__dict__ for item in data], f, ensure_ascii=False, indent=2)
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            digest = _payload_hash(payload)
+            self._cache_trends(country, data)
+            if self._data_hash.get(country) == digest:
+                logger.info(f"{country} 트렌드 데이터 변경 없음 (저장 생략)")
+                return
+            await asyncio.to_thread(_atomic_write, file_path, payload)
+            self._data_hash[country] = digest
             logger.info(f"{country} 트렌드 데이터 저장 완료")
         except Exception as e:
             logger.error(f"{country} 트렌드 데이터 저장 실패: {str(e)}")
 
     def _load_trends_data(self, country: str) -> List[TrendItem]:
-        """트렌드 데이터 로드"""
+        """트렌드 데이터 로드 (메모리 캐시가 있으면 파일을 다시 읽지 않음)"""
+        cached = self._trends_cache.get(country)
+        if cached is not None:
+            return cached[0]
+        
         file_path = self._get_data_file_path(country)
         try:
             if not file_path.exists():
                 logger.info(f"{country} 트렌드 데이터 파일이 없습니다.")
                 return []
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"{country} 트렌드 데이터 로드 완료")
-                return [TrendItem(**item) for item in data]
+            with open(file_path, 'rb') as f:
+                payload = f.read()
+            data = orjson.loads(payload)
+            self._data_hash[country] = _payload_hash(payload)
+            for item in data:
+                # video_id 필드가 없는 이전 형식 데이터는 URL에서 한 번만 추출
+                if "video_id" not in item:
+                    item["video_id"] = item["url"].rsplit("/", 1)[-1]
+            items = [TrendItem(**item) for item in data]
+            self._cache_trends(country, items)
+            logger.info(f"{country} 트렌드 데이터 로드 완료")
+            return items
         except Exception as e:
             logger.error(f"{country} 트렌드 데이터 로드 실패: {str(e)}")
             return []
 
+    def _cache_trends(self, country: str, data: List[TrendItem]):
+        """트렌드 데이터와 video_id 인덱스를 캐시에 저장"""
+        self._trends_cache[country] = (data, {item.video_id: item for item in data})
+
+    def _get_trends_index(self, country: str) -> Dict[str, TrendItem]:
+        """캐시된 이전 트렌드 데이터의 video_id 인덱스 반환"""
+        cached = self._trends_cache.get(country)
+        return cached[1] if cached is not None else {}
+
     def _load_sent_urls(self):
         """전송된 URL 로드"""
         file_path = self._get_sent_urls_file_path()
         if file_path.exists():
             try:
-                with open(file_path, 'r') as f:
-                    self.sent_urls = set(json.load(f))
+                with open(file_path, 'rb') as f:
+                    self.sent_urls = {orjson.loads(line) for line in f if line.strip()}
                 logger.info(f"전송된 URL {len(self.sent_urls)}개를 로드했습니다.")
             except Exception as e:
                 logger.error(f"전송된 URL 로드 실패: {str(e)}")
@@ -176,20 +278,37 @@ class YouTubeTrendsBot:
             logger.info("전송된 URL 파일이 없습니다. 새로운 세트를 생성합니다.")
             self.sent_urls = set()
 
-    def _save_sent_urls(self):
-        """전송된 URL 저장"""
+    def _mark_sent(self, items: List[TrendItem]):
+        """전송한 항목의 URL을 sent_urls에 추가 (새 URL만 기록 대기열에 추가)"""
+        for item in items:
+            if item.url not in self.sent_urls:
+                self.sent_urls.add(item.url)
+                self._pending_urls.append(item.url)
+
+    async def _save_sent_urls(self):
+        """새로 전송된 URL만 파일 끝에 추가 기록 (파일 쓰기는 별도 스레드에서 수행)"""
+        if not self._pending_urls:
+            return
         file_path = self._get_sent_urls_file_path()
+        # 기록하는 동안 추가되는 URL과 섞이지 않도록 대기열을 먼저 교체
+        pending, self._pending_urls = self._pending_urls, []
         try:
-            with open(file_path, 'w') as f:
-                json.dump(list(self.sent_urls), f)
-            logger.info(f"전송된 URL {len(self.sent_urls)}개를 저장했습니다.")
+            payload = b"".join(orjson.dumps(url) + b"\n" for url in pending)
+            await asyncio.to_thread(_append_bytes, file_path, payload)
+            logger.info(f"전송된 URL {len(pending)}개를 추가 저장했습니다. (총 {len(self.sent_urls)}개)")
         except Exception as e:
+            self._pending_urls[:0] = pending  # 다음 저장 때 다시 시도
             logger.error(f"전송된 URL 저장 실패: {str(e)}")
 
     def _reset_sent_urls(self):
         """전송된 URL 초기화 (매일 6시에 호출)"""
         self.sent_urls.clear()
-        self._save_sent_urls()
+        self._pending_urls.clear()
+        try:
+            # 파일 비우기
+            open(self._get_sent_urls_file_path(), 'w').close()
+        except Exception as e:
+            logger.error(f"전송된 URL 파일 초기화 실패: {str(e)}")
         logger.info("전송된 URL을 초기화했습니다.")
 
     def _load_last_sent_time(self):
@@ -197,8 +316,8 @@ class YouTubeTrendsBot:
         file_path = self._get_last_sent_time_file_path()
         if file_path.exists():
             try:
-                with open(file_path, 'r') as f:
-                    self.last_sent_time = json.load(f)
+                with open(file_path, 'rb') as f:
+                    self.last_sent_time = orjson.loads(f.read())
                 logger.info("마지막 전송 시간을 로드했습니다.")
             except:
                 self.last_sent_time = {}
@@ -209,14 +328,13 @@ class YouTubeTrendsBot:
         """마지막 전송 시간 저장"""
         file_path = self._get_last_sent_time_file_path()
         try:
-            with open(file_path, 'w') as f:
-                json.dump(self.last_sent_time, f)
+            _atomic_write_json(file_path, self.last_sent_time)
             logger.info("마지막 전송 시간을 저장했습니다.")
         except Exception as e:
             logger.error(f"마지막 전송 시간 저장 실패: {str(e)}")
 
-    def _detect_changes(self, old_data: List[TrendItem], new_data: List[TrendItem]) -> Dict[str, List[Any]]:
-        """트렌드 변경 감지"""
+    def _detect_changes(self, old_index: Dict[str, TrendItem], new_data: List[TrendItem]) -> Dict[str, List[Any]]:
+        """트렌드 변경 감지 (old_index: 이전 데이터의 video_id 인덱스)"""
         changes = {
             'new': [],
             'up': [],    # 순위 상승
@@ -224,20 +342,14 @@ class YouTubeTrendsBot:
             'same': []   # 순위 동일
         }
 
-        # 이전 데이터를 딕셔너리로 변환 (key: video_id, value: 순위와 제목)
-        old_items = {}
-        for item in old_data:
-            video_id = item.url.split("/")[-1]
-            old_items[video_id] = {"rank": item.rank, "title": item.title}
-        
-        logger.info(f"이전 데이터: {len(old_items)}개")
+        logger.info(f"이전 데이터: {len(old_index)}개")
         
         # 새로운 항목과 순위 변경 감지
         for new_item in new_data:
-            video_id = new_item.url.split("/")[-1]
+            old_item = old_index.get(new_item.video_id)
             
-            if video_id in old_items:
-                old_rank = old_items[video_id]["rank"]
+            if old_item is not None:
+                old_rank = old_item.rank
                 if new_item.rank < old_rank:  # 순위 상승
                     logger.info(f"순위 상승: {new_item.title} ({old_rank}위 → {new_item.rank}위)")
                     changes['up'].append({
@@ -268,68 +380,46 @@ class YouTubeTrendsBot:
 
         return changes
 
-    def _format_full_trends_message(self, country: str, data: List[TrendItem]) -> str:
+    def _format_full_trends_message(self, country: str, data: List[TrendItem], date_str: str) -> str:
         """전체 트렌드 데이터 메시지 포맷팅"""
         country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
         country_name = "한국" if country == "KR" else "미국"
-        current_time = get_korea_time()
-        
-        # 요일 한글 변환
-        weekdays = ['월', '화', '수', '목', '금', '토', '일']
-        weekday = weekdays[current_time.weekday()]
-        date_str = current_time.strftime(f"%Y-%m-%d {weekday}요일")
-        
-        message = f"📌 {country_emoji} {country_name} 유튜브 트렌드 ({date_str})\n"
-        #message += "📊 매일 오전 6시 최신 순위 업데이트\n\n"
-        
-        # 순위 이모지 매핑
-        rank_emojis = {
-            1: "1️⃣", 2: "2️⃣", 3: "3️⃣", 4: "4️⃣", 5: "5️⃣",
-            6: "6️⃣", 7: "7️⃣", 8: "8️⃣", 9: "9️⃣", 10: "🔟"
-        }
+
+        parts: List[str] = [f"📌 {country_emoji} {country_name} 유튜브 트렌드 ({date_str})\n"]
+        #parts.append("📊 매일 오전 6시 최신 순위 업데이트\n\n")
         
         for item in data:
-            rank_emoji = rank_emojis.get(item.rank, f"{item.rank}위")
-            message += f"{rank_emoji} [{item.title}]\n"
-            message += f"📺 {item.channel} | 👁️ {item.views}회\n"
-            message += f"🔗 {item.url}\n\n"
+            rank_emoji = RANK_EMOJIS.get(item.rank, f"{item.rank}위")
+            parts.append(f"{rank_emoji} [{item.title}]\n")
+            parts.append(f"📺 {item.channel} | 👁️ {item.views}회\n")
+            parts.append(f"🔗 {item.url}\n\n")
         
-        return message
+        return "".join(parts)
 
-    def _format_new_items_message(self, new_items: List[TrendItem], country: str) -> str:
+    def _format_new_items_message(self, new_items: List[TrendItem], country: str, date_str: str) -> str:
         """새로운 항목 메시지 포맷팅"""
         country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
         country_name = "한국" if country == "KR" else "미국"
-        current_time = get_korea_time()
-        
-        # 요일 한글 변환
-        weekdays = ['월', '화', '수', '목', '금', '토', '일']
-        weekday = weekdays[current_time.weekday()]
-        date_str = current_time.strftime(f"%Y-%m-%d {weekday}요일")
-        
-        message = f"📌 {country_emoji} {country_name} 유튜브 트렌드 신규 진입 ({date_str})\n"
-        message += "📊 새로운 인기 동영상이 등장했습니다\n\n"
-        
-        # 순위 이모지 매핑
-        rank_emojis = {
-            1: "1️⃣", 2: "2️⃣", 3: "3️⃣", 4: "4️⃣", 5: "5️⃣",
-            6: "6️⃣", 7: "7️⃣", 8: "8️⃣", 9: "9️⃣", 10: "🔟"
-        }
+
+        parts: List[str] = [
+            f"📌 {country_emoji} {country_name} 유튜브 트렌드 신규 진입 ({date_str})\n",
+            "📊 새로운 인기 동영상이 등장했습니다\n\n",
+        ]
         
         for item in new_items:
-            rank_emoji = rank_emojis.get(item.rank, f"{item.rank}위")
-            message += f"{rank_emoji} [{item.title}]\n"
-            message += f"📺 {item.channel} | 👁️ {item.views}회\n"
-            message += f"🔗 {item.url}\n\n"
+            rank_emoji = RANK_EMOJIS.get(item.rank, f"{item.rank}위")
+            parts.append(f"{rank_emoji} [{item.title}]\n")
+            parts.append(f"📺 {item.channel} | 👁️ {item.views}회\n")
+            parts.append(f"🔗 {item.url}\n\n")
         
-        return message
+        return "".join(parts)
 
     def _format_night_mode_message(self) -> str:
         """야간 모드 메시지 포맷팅"""
         # return "※ 새벽 2시~6시는 알림이 없습니다. 편안한 밤 되세요 🌙"
         return "편안한 밤 되세요 🌙"
 
-    def _format_changes_message(self, changes: Dict[str, List[Any]], country: str) -> Optional[str]:
+    def _format_changes_message(self, changes: Dict[str, List[Any]], country: str, date_str: str) -> Optional[str]:
         """변경사항 메시지 포맷팅"""
         # 변경사항이 없으면 None 반환
         if not (changes['new'] or changes['up'] or changes['down']):
@@ -338,20 +428,11 @@ class YouTubeTrendsBot:
 
         country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
         country_name = "한국" if country == "KR" else "미국"
-        current_time = get_korea_time()
-        
-        weekdays = ['월', '화', '수', '목', '금', '토', '일']
-        weekday = weekdays[current_time.weekday()]
-        date_str = current_time.strftime(f"%Y-%m-%d {weekday}요일")
-        
-        message = f"📌 {country_emoji} {country_name} 유튜브 트렌드 업데이트 ({date_str})\n"
-        message += "📊 순위 변경 및 신규 진입 동영상\n\n"
-        
-        # 순위 이모지 매핑
-        rank_emojis = {
-            1: "1️⃣", 2: "2️⃣", 3: "3️⃣", 4: "4️⃣", 5: "5️⃣",
-            6: "6️⃣", 7: "7️⃣", 8: "8️⃣", 9: "9️⃣", 10: "🔟"
-        }
+
+        parts: List[str] = [
+            f"📌 {country_emoji} {country_name} 유튜브 트렌드 업데이트 ({date_str})\n",
+            "📊 순위 변경 및 신규 진입 동영상\n\n",
+        ]
         
         # 모든 변경사항 합치기
         all_changes = []
@@ -388,84 +469,135 @@ class YouTubeTrendsBot:
         # 변경사항 포맷팅
         for change in all_changes:
             item = change['item']
-            rank_emoji = rank_emojis.get(item.rank, f"{item.rank}위")
+            rank_emoji = RANK_EMOJIS.get(item.rank, f"{item.rank}위")
             
             if change['type'] == 'new':
-                message += f"{rank_emoji} [{item.title}] New\n"
+                parts.append(f"{rank_emoji} [{item.title}] New\n")
             elif change['type'] == 'up':
-                message += f"{rank_emoji} [{item.title}] {change['old_rank']} → {change['new_rank']}\n"
+                parts.append(f"{rank_emoji} [{item.title}] {change['old_rank']} → {change['new_rank']}\n")
             elif change['type'] == 'down':
-                message += f"{rank_emoji} [{item.title}] {change['old_rank']} → {change['new_rank']}\n"
+                parts.append(f"{rank_emoji} [{item.title}] {change['old_rank']} → {change['new_rank']}\n")
             
-            message += f"📺 {item.channel} | 👁️ {item.views}회\n"
-            message += f"🔗 {item.url}\n\n"
+            parts.append(f"📺 {item.channel} | 👁️ {item.views}회\n")
+            parts.append(f"🔗 {item.url}\n\n")
         
-        return message
+        return "".join(parts)
 
-    def _format_daily_summary(self, country: str) -> str:
-        """일일 요약 메시지 포맷팅"""
+    def _format_daily_summary(self, country: str, date_str: str, data: Optional[List[TrendItem]] = None) -> str:
+        """일일 요약 메시지 포맷팅 (data가 없으면 저장된 트렌드 데이터를 로드)"""
         country_emoji = "🇰🇷" if country == "KR" else "🇺🇸"
         country_name = "한국" if country == "KR" else "미국"
-        current_time = get_korea_time()
-        
-        weekdays = ['월', '화', '수', '목', '금', '토', '일']
-        weekday = weekdays[current_time.weekday()]
-        date_str = current_time.strftime(f"%Y-%m-%d {weekday}요일")
-        
-        message = f"📋 {country_emoji} {country_name} 유튜브 트렌드 일일 요약 ({date_str})\n\n"
+
+        header = f"📋 {country_emoji} {country_name} 유튜브 트렌드 일일 요약 ({date_str})\n\n"
         
         try:
-            data = self._load_trends_data(country)
+            if data is None:
+                data = self._load_trends_data(country)
             if not data:
-                return message + "데이터가 없습니다."
-
-            rank_emojis = {
-                1: "1️⃣", 2: "2️⃣", 3: "3️⃣", 4: "4️⃣", 5: "5️⃣",
-                6: "6️⃣", 7: "7️⃣", 8: "8️⃣", 9: "9️⃣", 10: "🔟"
-            }
+                return header + "데이터가 없습니다."
 
+            parts: List[str] = [header]
             for item in data:
-                rank_emoji = rank_emojis.get(item.rank, f"{item.rank}위")
-                message += f"{rank_emoji} [{item.title}]\n"
-                message += f"📺 {item.channel} | 👁️ {item.views}회\n"
-                message += f"🔗 {item.url}\n\n"
+                rank_emoji = RANK_EMOJIS.get(item.rank, f"{item.rank}위")
+                parts.append(f"{rank_emoji} [{item.title}]\n")
+                parts.append(f"📺 {item.channel} | 👁️ {item.views}회\n")
+                parts.append(f"🔗 {item.url}\n\n")
 
-            message += "\n🌙 오늘 하루도 수고하셨습니다. 편안한 밤 되세요."
-            return message
+            parts.append("\n🌙 오늘 하루도 수고하셨습니다. 편안한 밤 되세요.")
+            return "".join(parts)
         except Exception as e:
             logger.error(f"일일 요약 생성 중 에러 발생: {str(e)}")
-            return message + "요약 생성 중 에러가 발생했습니다."
-
-    def init_youtube(self):
-        """YouTube API 클라이언트 초기화"""
-        if not self.youtube:
-            self.youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+            return header + "요약 생성 중 에러가 발생했습니다."
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """공유 HTTP 세션 반환 (최초 호출 시 생성)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=64, limit_per_host=8, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+        return self._session
+
+    async def startup(self):
+        """전송 대기열 생성 및 전송 작업자 시작"""
+        if self._sender_task is None or self._sender_task.done():
+            # 대기열은 이벤트 루프에 묶이므로 작업자와 함께 생성
+            self._outbox = asyncio.Queue(maxsize=OUTBOX_MAX_SIZE)
+            self._sender_task = asyncio.create_task(self._sender_worker())
+
+    async def shutdown(self):
+        """남은 메시지 전송 후 전송 작업자와 공유 HTTP 세션 종료 (대기 시간 제한)"""
+        if self._sender_task is not None:
+            if not self._sender_task.done():
+                try:
+                    await asyncio.wait_for(self._outbox.join(), timeout=OUTBOX_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    pass
+            if not self._outbox.empty():
+                logger.warning(f"종료 시 전송하지 못한 메시지 {self._outbox.qsize()}개를 버렸습니다.")
+            self._sender_task.cancel()
+            try:
+                await self._sender_task
+            except asyncio.CancelledError:
+                pass
+            self._sender_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _enqueue(self, message: str):
+        """전송 대기열에 메시지 추가 (가득 찬 경우 가장 오래된 메시지를 버림)"""
+        if self._outbox.full():
+            self._outbox.get_nowait()
+            self._outbox.task_done()
+            logger.warning("전송 대기열이 가득 차 가장 오래된 메시지를 버렸습니다.")
+        self._outbox.put_nowait(message)
+
+    def _flush_batch(self, messages: List[str]):
+        """연속된 메시지를 텔레그램 길이 제한 안에서 하나로 합쳐 전송 대기열에 추가"""
+        batch = ""
+        for message in messages:
+            candidate = f"{batch.rstrip()}{MESSAGE_SEPARATOR}{message}" if batch else message
+            if batch and _telegram_length(candidate) > TELEGRAM_BATCH_LIMIT:
+                self._enqueue(batch)
+                batch = message
+            else:
+                batch = candidate
+        if batch:
+            self._enqueue(batch)
+
+    async def _sender_worker(self):
+        """전송 대기열의 메시지를 순서대로 텔레그램으로 전송"""
+        while True:
+            message = await self._outbox.get()
+            try:
+                await self.send_telegram_message(message)
+            finally:
+                self._outbox.task_done()
 
     async def send_telegram_message(self, message: str) -> bool:
         """텔레그램으로 메시지를 전송하는 함수"""
         try:
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-            data = {
-                "chat_id": TELEGRAM_CHAT_ID,
-                "text": message,
-                "parse_mode": "HTML"
-            }
+            # 고정 필드는 미리 만들어 둔 템플릿에 본문만 합쳐 한 번 직렬화
+            payload = orjson.dumps(self._tg_base | {"text": message})
             
+            session = self._get_session()
             for attempt in range(self.retry_count):
+                delay = self.retry_delay
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(url, json=data) as response:
+                    async with self._rl_min, self._rl_sec:
+                        async with session.post(self._tg_url, data=payload, headers=_JSON_HEADERS) as response:
                             if response.status == 200:
                                 logger.info("텔레그램 메시지 전송 성공")
                                 return True
-                            else:
-                                logger.error(f"텔레그램 메시지 전송 실패 (시도 {attempt + 1}/{self.retry_count}): {response.status}")
-                                if attempt < self.retry_count - 1:
-                                    await asyncio.sleep(self.retry_delay)
+                            logger.error(f"텔레그램 메시지 전송 실패 (시도 {attempt + 1}/{self.retry_count}): {response.status}")
+                            if response.status == 429:
+                                # 요청 한도 초과 시 텔레그램이 알려준 시간만큼 대기
+                                body = await response.json(content_type=None)
+                                delay = body.get("parameters", {}).get("retry_after", delay)
                 except Exception as e:
                     logger.error(f"텔레그램 메시지 전송 중 에러 발생 (시도 {attempt + 1}/{self.retry_count}): {str(e)}")
-                    if attempt < self.retry_count - 1:
-                        await asyncio.sleep(self.retry_delay)
+                
+                if attempt < self.retry_count - 1:
+                    await asyncio.sleep(delay)
             
             return False
             
@@ -478,17 +610,21 @@ class YouTubeTrendsBot:
         logger.info(f"유튜브 트렌드 수집 시작... (국가: {region_code})")
         
         try:
-            self.init_youtube()
+            # YouTube Data API REST 엔드포인트를 공유 세션으로 직접 호출 (이벤트 루프를 막지 않음)
+            params = {
+                "part": "snippet,statistics",
+                "chart": "mostPopular",
+                "regionCode": region_code,
+                "maxResults": 10,
+                "key": YOUTUBE_API_KEY
+            }
+            session = self._get_session()
             
             for attempt in range(self.retry_count):
                 try:
-                    request = self.youtube.videos().list(
-                        part="snippet,statistics",
-                        chart="mostPopular",
-                        regionCode=region_code,
-                        maxResults=10
-                    )
-                    response = request.execute()
+                    async with session.get(YOUTUBE_VIDEOS_URL, params=params) as r:
+                        r.raise_for_status()
+                        response = await r.json()
                     
                     trends_data = []
                     for idx, item in enumerate(response['items'], 1):
@@ -506,7 +642,8 @@ class YouTubeTrendsBot:
                             rank=idx,
                             channel=channel,
                             views=views_str,
-                            url=video_url
+                            url=video_url,
+                            video_id=video_id
                         )
                         trends_data.append(trend_item)
                     
@@ -516,7 +653,7 @@ class YouTubeTrendsBot:
                 except Exception as e:
                     logger.error(f"유튜브 트렌드 수집 중 에러 발생 (시도 {attempt + 1}/{self.retry_count}): {str(e)}")
                     if attempt < self.retry_count - 1:
-                        await asyncio.sleep(self.retry_delay)
+                        await asyncio.sleep(self.retry_delay * 2 ** attempt)
             
             return None
                 
@@ -546,18 +683,19 @@ class YouTubeTrendsBot:
         }
         
         try:
-            # 1. 유튜브 트렌드 한국
-            kr_youtube_trends = await self.get_youtube_trends("KR")
-            if kr_youtube_trends is not None:
-                collected_data["KR"] = kr_youtube_trends
-                logger.info("한국 유튜브 트렌드 데이터 수집 완료")
-                await asyncio.sleep(5)
-
-            # 2. 유튜브 트렌드 미국
-            us_youtube_trends = await self.get_youtube_trends("US")
-            if us_youtube_trends is not None:
-                collected_data["US"] = us_youtube_trends
-                logger.info("미국 유튜브 트렌드 데이터 수집 완료")
+            # 한국/미국 유튜브 트렌드를 동시에 수집
+            targets = [("KR", "한국 유튜브 트렌드"), ("US", "미국 유튜브 트렌드")]
+            results = await asyncio.gather(
+                *(self.get_youtube_trends(country) for country, _ in targets),
+                return_exceptions=True
+            )
+            
+            for (country, label), trends in zip(targets, results):
+                if isinstance(trends, Exception):
+                    logger.error(f"{label} 데이터 수집 중 에러 발생: {str(trends)}")
+                elif trends is not None:
+                    collected_data[country] = trends
+                    logger.info(f"{label} 데이터 수집 완료")
             
             logger.info("=== 데이터 수집 완료 ===\n")
             return collected_data
@@ -569,10 +707,12 @@ class YouTubeTrendsBot:
 
     async def send_trends_updates(self, collected_data):
         """트렌드 데이터를 전송하는 함수"""
+        messages: List[str] = []  # 이번 주기에 보낼 메시지 (마지막에 묶어서 대기열에 추가)
         try:
             # 1. 업데이트 시간 체크
+            # 이번 주기의 시간과 메시지 헤더 날짜는 한 번만 계산해 포맷팅 함수에 전달
             current_time = get_korea_time()
-            current_hour = current_time.hour
+            date_str = format_korea_date(current_time)
             
             logger.info(f"현재 시간: {current_time.strftime('%Y-%m-%d %H:%M')}")
             
@@ -580,16 +720,17 @@ class YouTubeTrendsBot:
             if is_daily_summary_time():
                 logger.info("일일 요약 시간입니다.")
                 for country in ["KR", "US"]:
-                    summary = self._format_daily_summary(country)
-                    await self.send_telegram_message(summary)
-                    logger.info(f"{country} 유튜브 트렌드 일일 요약 전송 완료")
+                    cached = self._trends_cache.get(country)
+                    summary = self._format_daily_summary(country, date_str, cached[0] if cached is not None else None)
+                    messages.append(summary)
+                    logger.info(f"{country} 유튜브 트렌드 일일 요약 전송 대기열 추가")
                 return
             
             # 업데이트 시간이 아니면 종료
             if not is_update_time():
                 logger.info("현재는 업데이트 시간이 아닙니다.")
                 night_message = self._format_night_mode_message()
-                await self.send_telegram_message(night_message)
+                messages.append(night_message)
                 return
 
             # 2. 매일 6시에는 전체 데이터 전송
@@ -600,16 +741,15 @@ class YouTubeTrendsBot:
                 
                 for country in ["KR", "US"]:
                     if collected_data[country]:
-                        message = self._format_full_trends_message(country, collected_data[country])
-                        await self.send_telegram_message(message)
-                        logger.info(f"{country} 유튜브 트렌드 전체 데이터 전송 완료")
+                        message = self._format_full_trends_message(country, collected_data[country], date_str)
+                        messages.append(message)
+                        logger.info(f"{country} 유튜브 트렌드 전체 데이터 전송 대기열 추가")
                         
                         # 전송한 URL을 sent_urls에 추가
-                        for item in collected_data[country]:
-                            self.sent_urls.add(item.url)
-                        self._save_sent_urls()  # URL 저장
+                        self._mark_sent(collected_data[country])
+                        await self._save_sent_urls()  # URL 저장
                         
-                        self._save_trends_data(country, collected_data[country])
+                        await self._save_trends_data(country, collected_data[country])
                 return
 
             # 3. 한국 트렌드 처리
@@ -620,35 +760,31 @@ class YouTubeTrendsBot:
                 # 이전 데이터가 없는 경우에만 전체 데이터 전송
                 if not old_data:
                     logger.info("이전 데이터가 없습니다. 전체 데이터를 전송합니다.")
-                    message = self._format_full_trends_message("KR", collected_data["KR"])
-                    await self.send_telegram_message(message)
+                    message = self._format_full_trends_message("KR", collected_data["KR"], date_str)
+                    messages.append(message)
                     
                     # 전송한 URL을 sent_urls에 추가
-                    for item in collected_data["KR"]:
-                        self.sent_urls.add(item.url)
-                    self._save_sent_urls()  # URL 저장
+                    self._mark_sent(collected_data["KR"])
+                    await self._save_sent_urls()  # URL 저장
                     
-                    self._save_trends_data("KR", collected_data["KR"])
+                    await self._save_trends_data("KR", collected_data["KR"])
                 else:
                     # 변경사항 감지
-                    changes = self._detect_changes(old_data, collected_data["KR"])
+                    changes = self._detect_changes(self._get_trends_index("KR"), collected_data["KR"])
                     
                     # 변경사항이 있는 경우에만 메시지 전송
-                    message = self._format_changes_message(changes, "KR")
+                    message = self._format_changes_message(changes, "KR", date_str)
                     if message is not None:  # None이 아닌 경우에만 전송
-                        await self.send_telegram_message(message)
-                        logger.info("한국 유튜브 트렌드 변경사항 전송 완료")
+                        messages.append(message)
+                        logger.info("한국 유튜브 트렌드 변경사항 전송 대기열 추가")
                         
-                        # 모든 URL 추가 (중복 방지는 set에서 자동으로 처리)
-                        for item in collected_data["KR"]:
-                            self.sent_urls.add(item.url)
-                        self._save_sent_urls()  # URL 저장
+                        # 전송한 URL을 sent_urls에 추가
+                        self._mark_sent(collected_data["KR"])
+                        await self._save_sent_urls()  # URL 저장
                         
-                        self._save_trends_data("KR", collected_data["KR"])
+                        await self._save_trends_data("KR", collected_data["KR"])
                     else:
                         logger.info("한국 유튜브 트렌드 변경사항 없음")
-                
-                await asyncio.sleep(5)
 
             # 4. 미국 트렌드 처리
             if collected_data["US"]:
@@ -658,31 +794,29 @@ class YouTubeTrendsBot:
                 # 이전 데이터가 없는 경우에만 전체 데이터 전송
                 if not old_data:
                     logger.info("이전 데이터가 없습니다. 전체 데이터를 전송합니다.")
-                    message = self._format_full_trends_message("US", collected_data["US"])
-                    await self.send_telegram_message(message)
+                    message = self._format_full_trends_message("US", collected_data["US"], date_str)
+                    messages.append(message)
                     
                     # 전송한 URL을 sent_urls에 추가
-                    for item in collected_data["US"]:
-                        self.sent_urls.add(item.url)
-                    self._save_sent_urls()  # URL 저장
+                    self._mark_sent(collected_data["US"])
+                    await self._save_sent_urls()  # URL 저장
                     
-                    self._save_trends_data("US", collected_data["US"])
+                    await self._save_trends_data("US", collected_data["US"])
                 else:
                     # 변경사항 감지
-                    changes = self._detect_changes(old_data, collected_data["US"])
+                    changes = self._detect_changes(self._get_trends_index("US"), collected_data["US"])
                     
                     # 변경사항이 있는 경우에만 메시지 전송
-                    message = self._format_changes_message(changes, "US")
+                    message = self._format_changes_message(changes, "US", date_str)
                     if message is not None:  # None이 아닌 경우에만 전송
-                        await self.send_telegram_message(message)
-                        logger.info("미국 유튜브 트렌드 변경사항 전송 완료")
+                        messages.append(message)
+                        logger.info("미국 유튜브 트렌드 변경사항 전송 대기열 추가")
                         
-                        # 모든 URL 추가 (중복 방지는 set에서 자동으로 처리)
-                        for item in collected_data["US"]:
-                            self.sent_urls.add(item.url)
-                        self._save_sent_urls()  # URL 저장
+                        # 전송한 URL을 sent_urls에 추가
+                        self._mark_sent(collected_data["US"])
+                        await self._save_sent_urls()  # URL 저장
                         
-                        self._save_trends_data("US", collected_data["US"])
+                        await self._save_trends_data("US", collected_data["US"])
                     else:
                         logger.info("미국 유튜브 트렌드 변경사항 없음")
         
@@ -694,6 +828,29 @@ class YouTubeTrendsBot:
         except Exception as e:
             error_message = f"에러 발생: {str(e)}"
             logger.error(f"치명적 에러 발생: {error_message}")
+        finally:
+            self._flush_batch(messages)
+
+def get_next_scheduled_time():
+    """다음 예정된 실행 시간 계산"""
+    current_time = get_korea_time()
+    
+    # 현재 시간보다 큰 다음 실행 시간 찾기
+    for hour in SCHEDULED_HOURS:
+        if current_time.hour < hour:
+            return current_time.replace(hour=hour, minute=0, second=0, microsecond=0)
+    
+    # 다음 날 첫 실행 시간으로 설정 (월말에도 안전하도록 timedelta 사용)
+    next_time = current_time.replace(hour=SCHEDULED_HOURS[0], minute=0, second=0, microsecond=0)
+    return next_time + timedelta(days=1)
+
+async def _sleep_until(target: datetime):
+    """지정한 시각까지 대기 (깨어난 뒤 실제 시각을 다시 확인해 일찍 깨면 남은 시간만큼 더 대기)"""
+    while True:
+        remaining = (target - get_korea_time()).total_seconds()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(remaining)
 
 async def scheduled_job(bot: YouTubeTrendsBot):
     """정해진 시간에 실행될 작업"""
@@ -704,10 +861,11 @@ async def scheduled_job(bot: YouTubeTrendsBot):
     if is_update_time() and collected_data:
         await bot.send_trends_updates(collected_data)
 
-def run_scheduler():
-    """스케줄러 실행"""
+async def main():
+    """스케줄러 실행 (하나의 이벤트 루프와 HTTP 세션을 계속 유지)"""
     logger.info("=== 유튜브 트렌드 봇 시작 ===")
-    logger.info("4시간마다 유튜브 트렌드를 수집하여 텔레그램으로 전송합니다.")
+    logger.info("약 4시간 간격으로 유튜브 트렌드를 수집하여 텔레그램으로 전송합니다.")
+    logger.info(f"실행 시간: {', '.join(f'{hour}시' for hour in SCHEDULED_HOURS)} (한국 시간)")
     logger.info("업데이트 시간: 6시 ~ 1시 (한국 시간)")
     logger.info("매일 6시에는 전체 데이터를 전송합니다.")
     
@@ -717,16 +875,20 @@ def run_scheduler():
     
     # 봇 인스턴스 생성
     bot = YouTubeTrendsBot()
+    await bot.startup()
     
-    # 시작할 때 한 번 실행
-    asyncio.run(scheduled_job(bot))
-    
-    # 4시간마다 실행 (0시, 4시, 8시, 12시, 16시, 20시)
-    schedule.every(4).hours.at(":00").do(lambda: asyncio.run(scheduled_job(bot)))
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(10)  # 10초마다 체크
+    try:
+        # 시작할 때 한 번 실행
+        await scheduled_job(bot)
+        
+        # SCHEDULED_HOURS에 정한 시각마다 실행 (1시, 6시, 10시, 14시, 18시, 22시)
+        while True:
+            next_time = get_next_scheduled_time()
+            logger.info(f"다음 실행 예정 시간: {next_time.strftime('%Y-%m-%d %H:%M')}")
+            await _sleep_until(next_time)
+            await scheduled_job(bot)
+    finally:
+        await bot.shutdown()
 
 if __name__ == "__main__":
-    run_scheduler() 
\ No newline at end of file
+    asyncio.run(main())